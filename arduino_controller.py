@@ -2,47 +2,124 @@
 Arduino controller module for managing dual traffic lights.
 Communicates with Arduino Uno via serial connection.
 """
+import logging
+import os
+import queue
 import serial
 import serial.tools.list_ports
+import sys
+import threading
 import time
-from typing import Optional, List
+import weakref
+from concurrent.futures import Future
+from typing import Iterable, Optional, List, Tuple
+
+
+# Display names for the light color codes used in R1/Y1/G1 style commands
+COLOR_NAMES = {'R': 'RED', 'Y': 'YELLOW', 'G': 'GREEN'}
+
+# Commands understood by traffic_lights.ino
+COMMANDS = ("R1", "Y1", "G1", "R2", "Y2", "G2", "A", "M", "E", "OFF", "T", "STATUS")
+
+# Binary set-state packet: opcode, light mask, color codes, newline.
+# The opcode is a control character, so it can't be mistaken for a text command.
+STATE_OPCODE = 0x02
+
+# Color codes used in set_state() (0 turns a light off)
+STATE_CODES = {'R': 1, 'Y': 2, 'G': 3}
 
 
 class ArduinoController:
     """Controls Arduino Uno board for dual traffic light management."""
 
-    def __init__(self, port: Optional[str] = None, baudrate: int = 9600, timeout: int = 2):
+    def __init__(self, port: Optional[str] = None, baudrate: int = 115200, timeout: int = 2,
+                 auto_flush: bool = True, fast_reset: bool = True, low_latency: bool = True):
         """
         Initialize Arduino controller.
 
         Args:
             port: Serial port (e.g., 'COM3' on Windows, '/dev/ttyUSB0' on Linux)
                   If None, will auto-detect Arduino
-            baudrate: Communication speed (default: 9600)
+            baudrate: Communication speed (default: 115200, must match traffic_lights.ino)
             timeout: Serial timeout in seconds
+            auto_flush: Write each command immediately. If False, commands are
+                        buffered until flush_tx() is called.
+            fast_reset: Wait for the Arduino boot banner after connecting instead
+                        of sleeping a fixed 2 seconds
+            low_latency: On Linux, set the ASYNC_LOW_LATENCY flag so USB serial
+                         adapters deliver received bytes without the 16 ms batching delay
         """
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self.auto_flush = auto_flush
+        self.fast_reset = fast_reset
+        self.low_latency = low_latency
         self.serial = None
         self.connected = False
 
+        # Cached "connected and port open" flag checked on every command;
+        # only connect(), disconnect() and check_connection() change it
+        self._ready = False
+
+        # Per-command messages are DEBUG level, so nothing is formatted or
+        # written on the light-cycling path unless debug logging is enabled
+        self._log = logging.getLogger(__name__)
+
+        # Outgoing bytes waiting to be written in a single write() call
+        self._tx_buf = bytearray()
+        self._tx_lock = threading.RLock()
+
+        # All serial writes happen on one background thread fed by this queue,
+        # so commands from different threads never interleave on the wire
+        self._tx_queue = queue.Queue()
+        self._tx_thread = None
+        self._tx_abort = threading.Event()
+
+        # Raw file descriptor of the port (POSIX only), written with os.write()
+        # on the transmit thread to skip pyserial's per-write overhead
+        self._fd = None
+
+        # Received bytes not yet returned as a complete line
+        self._rx_buf = bytearray()
+
+        # Pre-encoded protocol commands, so sending is a dict lookup
+        self._encoded = {c: f"{c}\n".encode("ascii") for c in COMMANDS}
+
+        # Pre-encoded light commands, keyed by (light number, color code)
+        self._cmd = {(idx, color): self._encoded[f"{color}{idx}"]
+                     for idx in (1, 2) for color in COLOR_NAMES}
+
         # Try to connect
         self.connect()
 
-    def list_ports(self) -> List[str]:
-        """List all available serial ports."""
-        ports = serial.tools.list_ports.comports()
+    @staticmethod
+    def list_ports(ports=None) -> List[str]:
+        """
+        List all available serial ports.
+
+        Args:
+            ports: Result of serial.tools.list_ports.comports() to reuse.
+                   If None, ports are enumerated.
+        """
+        if ports is None:
+            ports = serial.tools.list_ports.comports()
         return [port.device for port in ports]
 
-    def auto_detect_arduino(self) -> Optional[str]:
+    @staticmethod
+    def auto_detect_arduino(ports=None) -> Optional[str]:
         """
         Auto-detect Arduino Uno port.
 
+        Args:
+            ports: Result of serial.tools.list_ports.comports() to reuse.
+                   If None, ports are enumerated.
+
         Returns:
             Port name if found, None otherwise
         """
-        ports = serial.tools.list_ports.comports()
+        if ports is None:
+            ports = serial.tools.list_ports.comports()
         for port in ports:
             # Arduino Uno typically shows up with these identifiers
             if 'Arduino' in port.description or 'CH340' in port.description or 'USB Serial' in port.description:
@@ -56,13 +133,19 @@ class ArduinoController:
         Returns:
             True if connected successfully, False otherwise
         """
+        # Reconnecting: stop the old transmit thread and close the old port first
+        self._stop_tx_thread()
+        self._close_port()
+
         try:
             # Auto-detect if port not specified
             if self.port is None:
-                self.port = self.auto_detect_arduino()
+                # Enumerate once; used for detection and the error message
+                ports = list(serial.tools.list_ports.comports())
+                self.port = self.auto_detect_arduino(ports)
                 if self.port is None:
                     print("Arduino not found. Available ports:")
-                    for port in self.list_ports():
+                    for port in self.list_ports(ports):
                         print(f"  - {port}")
                     return False
 
@@ -70,29 +153,135 @@ class ArduinoController:
             self.serial = serial.Serial(
                 port=self.port,
                 baudrate=self.baudrate,
-                timeout=self.timeout
+                timeout=self.timeout,
+                write_timeout=0  # Non-blocking writes, see _tx_loop()
             )
 
+            if self.low_latency:
+                self.enable_low_latency()
+
             # Wait for Arduino to reset
-            time.sleep(2)
+            if self.fast_reset:
+                self._wait_for_boot()
+            else:
+                time.sleep(2)
 
             # Clear any initial data
             self.serial.reset_input_buffer()
             self.serial.reset_output_buffer()
+            self._rx_buf.clear()
+
+            # pyserial opens POSIX ports non-blocking, so os.write() on the fd
+            # behaves like write_timeout=0; Windows ports have no fileno()
+            try:
+                self._fd = self.serial.fileno()
+            except (AttributeError, OSError, ValueError):
+                self._fd = None
+
+            # The thread only holds a weak reference to the controller, so a
+            # dropped controller is still collected and __del__ disconnects it
+            self._tx_abort = threading.Event()
+            self._tx_thread = threading.Thread(
+                target=_tx_loop,
+                args=(weakref.ref(self), self._tx_queue, self.serial, self._fd, self._tx_abort),
+                daemon=True
+            )
+            self._tx_thread.start()
 
             self.connected = True
+            self._ready = True
             print(f"✓ Connected to Arduino on {self.port}")
             return True
 
         except serial.SerialException as e:
             print(f"Failed to connect to Arduino: {e}")
-            self.connected = False
+            self._close_port()
             return False
         except Exception as e:
             print(f"Error connecting to Arduino: {e}")
-            self.connected = False
+            self._close_port()
+            return False
+
+    def _close_port(self):
+        """Close a port left open by a failed connect()."""
+        self.connected = False
+        self._ready = False
+        if self.serial is not None:
+            try:
+                self.serial.close()
+            except Exception:
+                pass
+            self.serial = None
+
+    def enable_low_latency(self, rx_size: int = 65536, tx_size: int = 4096) -> bool:
+        """
+        Tune the serial device for short command/response round trips.
+        On Linux, sets ASYNC_LOW_LATENCY so USB serial adapters deliver received
+        bytes without the 16 ms batching delay. On Windows, enlarges the driver
+        buffers. Called by connect() unless low_latency=False.
+        Drivers that don't support a setting (e.g. native USB CDC) are left as they are.
+
+        Args:
+            rx_size: Driver receive buffer size in bytes (Windows only)
+            tx_size: Driver transmit buffer size in bytes (Windows only)
+
+        Returns:
+            True if low latency mode was enabled on Linux, False otherwise
+        """
+        if self.serial is None:
+            return False
+
+        if hasattr(self.serial, "set_buffer_size"):
+            try:
+                self.serial.set_buffer_size(rx_size=rx_size, tx_size=tx_size)
+            except (OSError, ValueError, serial.SerialException) as e:
+                self._log.debug("Could not resize buffers on %s: %s", self.port, e)
+
+        if not sys.platform.startswith("linux"):
+            return False
+
+        try:
+            # pyserial issues the TIOCGSERIAL/TIOCSSERIAL ioctls for us
+            self.serial.set_low_latency_mode(True)
+            return True
+        except (AttributeError, OSError, ValueError) as e:
+            self._log.debug("Low latency mode not available on %s: %s", self.port, e)
             return False
 
+    def _wait_for_boot(self, poll_interval: float = 0.05, max_polls: int = 40,
+                       quiet_time: float = 0.1):
+        """
+        Reset the Arduino via DTR and wait until its boot banner has arrived.
+
+        Args:
+            poll_interval: Seconds between polls of the input buffer
+            max_polls: Maximum number of polls before giving up (40 x 50 ms = 2 s)
+            quiet_time: Seconds without new bytes after which the banner is done
+        """
+        try:
+            self.serial.dtr = False
+            time.sleep(poll_interval)
+            self.serial.dtr = True
+        except (OSError, serial.SerialException) as e:
+            # No modem control lines (e.g. a pty from socat or a simulator);
+            # just wait for whatever the device sends
+            self._log.debug("Could not pulse DTR on %s: %s", self.port, e)
+
+        for _ in range(max_polls):
+            if self.serial.in_waiting:
+                break
+            time.sleep(poll_interval)
+        else:
+            return
+
+        # Drain the banner until the line goes quiet
+        last_rx = time.monotonic()
+        while time.monotonic() - last_rx < quiet_time:
+            if self.serial.in_waiting:
+                self.serial.read_all()
+                last_rx = time.monotonic()
+            time.sleep(0.01)
+
     def send_command(self, command: str) -> bool:
         """
         Send command to Arduino.
@@ -103,88 +292,190 @@ class ArduinoController:
         Returns:
             True if sent successfully, False otherwise
         """
-        if not self.connected or self.serial is None:
+        if not self._ready:
             return False
 
-        try:
-            # Send command with newline
-            self.serial.write(f"{command}\n".encode())
-            self.serial.flush()
-            return True
-        except Exception as e:
-            print(f"Error sending command: {e}")
+        # Queue command with newline
+        return self._queue(self._encode(command))
+
+    def _queue(self, payload: bytes) -> bool:
+        """Add bytes to the tx buffer, writing them out if auto_flush is on."""
+        with self._tx_lock:
+            self._tx_buf += payload
+            if self.auto_flush:
+                return self.flush_tx()
+        return True
+
+    def _encode(self, command: str) -> bytes:
+        """Return the newline-terminated bytes for a command."""
+        payload = self._encoded.get(command)
+        if payload is None:
+            payload = f"{command}\n".encode("ascii")
+        return payload
+
+    def send_commands(self, commands: Iterable[str]) -> bool:
+        """
+        Send several commands to Arduino in one write.
+
+        Args:
+            commands: Command strings to send, in order
+
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        if not self._ready:
             return False
 
-    def set_red_1(self) -> bool:
+        with self._tx_lock:
+            for command in commands:
+                self._tx_buf += self._encode(command)
+            return self.flush_tx()
+
+    def write_batch(self, payload: bytes) -> bool:
         """
-        Set traffic light 1 to RED.
+        Send pre-encoded commands to Arduino in one write.
+
+        Args:
+            payload: Newline-terminated command bytes, e.g. b"R1\nG2\n"
 
         Returns:
-            True if command sent successfully
+            True if sent successfully, False otherwise
         """
-        success = self.send_command("R1")
-        if success:
-            print("→ Arduino: Light 1 set to RED")
-        return success
+        if not self._ready:
+            return False
 
-    def set_yellow_1(self) -> bool:
+        with self._tx_lock:
+            self._tx_buf += payload
+            return self.flush_tx()
+
+    def schedule(self, sequence: Iterable[Tuple[str, float]]) -> Future:
         """
-        Set traffic light 1 to YELLOW.
+        Send a timed sequence of commands without blocking the caller.
+        The first command is queued immediately; each following one is queued
+        when the previous command's hold time has passed. Timing is kept by a
+        background thread against absolute deadlines, so delays don't add up.
+        Each step is handed to the transmit thread right away, even with
+        auto_flush=False.
+
+        Args:
+            sequence: (command, hold seconds) pairs, e.g. [("R1", 1.5), ("Y1", 1.5)]
 
         Returns:
-            True if command sent successfully
+            Future that resolves to True once every command has been queued
+            for the transmit thread, or to False as soon as one fails
         """
-        success = self.send_command("Y1")
-        if success:
-            print("→ Arduino: Light 1 set to YELLOW")
-        return success
+        result = Future()
+        sequence = [(self._encode(command), hold) for command, hold in sequence]
+        if not sequence or not self.write_batch(sequence[0][0]):
+            result.set_result(False)
+            return result
+
+        def run(deadline):
+            for payload, hold in sequence[1:]:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                if not self.write_batch(payload):
+                    result.set_result(False)
+                    return
+                deadline += hold
+            result.set_result(True)
 
-    def set_green_1(self) -> bool:
+        threading.Thread(target=run, args=(time.monotonic() + sequence[0][1],), daemon=True).start()
+        return result
+
+    def flush_tx(self) -> bool:
         """
-        Set traffic light 1 to GREEN.
+        Hand all buffered commands to the transmit thread as one write.
 
         Returns:
-            True if command sent successfully
+            True if queued successfully, False otherwise
         """
-        success = self.send_command("G1")
-        if success:
-            print("→ Arduino: Light 1 set to GREEN")
-        return success
+        with self._tx_lock:
+            if not self._tx_buf:
+                return True
+            if not self._ready:
+                self._tx_buf.clear()
+                return False
+
+            self._tx_queue.put(bytes(self._tx_buf))
+            self._tx_buf.clear()
+        return True
 
-    def set_red_2(self) -> bool:
+    def _stop_tx_thread(self):
         """
-        Set traffic light 2 to RED.
+        Stop the transmit thread after it has written everything queued.
+        If that takes longer than a second, unsent bytes are dropped. Either
+        way the thread has exited on return, so the port can be closed safely.
+        """
+        if self._tx_thread is None:
+            return
+        self._tx_queue.put(None)
+        if self._tx_thread is not threading.current_thread():
+            self._tx_thread.join(timeout=1.0)
+            if self._tx_thread.is_alive():
+                self._tx_abort.set()
+                self._tx_thread.join()
+        self._tx_thread = None
+
+    def flush(self) -> bool:
+        """
+        Write buffered commands and block until they have left the serial port.
+        Only needed where delivery must be confirmed, e.g. before a status
+        query or before closing the port.
 
         Returns:
-            True if command sent successfully
+            True if all data was sent, False otherwise
         """
-        success = self.send_command("R2")
-        if success:
-            print("→ Arduino: Light 2 set to RED")
-        return success
+        if not self._ready or not self.flush_tx():
+            return False
 
-    def set_yellow_2(self) -> bool:
+        try:
+            # Wait for the transmit thread to write everything queued so far
+            self._tx_queue.join()
+            self.serial.flush()
+            return True
+        except Exception as e:
+            print(f"Error flushing serial port: {e}")
+            return False
+
+    def set_light(self, idx: int, color: str, announce: bool = False) -> bool:
         """
-        Set traffic light 2 to YELLOW.
+        Set one traffic light to a color.
+
+        Args:
+            idx: Traffic light number (1 or 2)
+            color: 'R', 'Y' or 'G'
+            announce: Log the change at DEBUG level
 
         Returns:
             True if command sent successfully
         """
-        success = self.send_command("Y2")
-        if success:
-            print("→ Arduino: Light 2 set to YELLOW")
+        if not self._ready:
+            return False
+
+        success = self._queue(self._cmd[(idx, color)])
+        if success and announce:
+            self._log.debug("→ Arduino: Light %d set to %s", idx, COLOR_NAMES[color])
         return success
 
-    def set_green_2(self) -> bool:
+    def set_state(self, mask: int, colors: int) -> bool:
         """
-        Set traffic light 2 to GREEN.
+        Set one or both traffic lights with a single 4-byte command.
+
+        Args:
+            mask: Lights to change; bit 0 = light 1, bit 1 = light 2
+            colors: Color codes from STATE_CODES (0 = off); light 1 in the low
+                    nibble, light 2 in the high nibble.
+                    E.g. set_state(0b11, 0x31) sets light 1 RED, light 2 GREEN.
 
         Returns:
             True if command sent successfully
         """
-        success = self.send_command("G2")
+        if not self._ready:
+            return False
+
+        success = self._queue(bytes((STATE_OPCODE, mask & 0x03, colors & 0x33, 0x0A)))
         if success:
-            print("→ Arduino: Light 2 set to GREEN")
+            self._log.debug("→ Arduino: State mask=%d colors=0x%02x", mask, colors)
         return success
 
     def set_auto_mode(self) -> bool:
@@ -199,7 +490,7 @@ class ArduinoController:
         """
         success = self.send_command("A")
         if success:
-            print("→ Arduino: Automatic mode enabled (dual lights, opposite phases)")
+            self._log.debug("→ Arduino: Automatic mode enabled (dual lights, opposite phases)")
         return success
 
     def set_manual_mode(self) -> bool:
@@ -212,7 +503,7 @@ class ArduinoController:
         """
         success = self.send_command("M")
         if success:
-            print("→ Arduino: Manual mode enabled")
+            self._log.debug("→ Arduino: Manual mode enabled")
         return success
 
     def set_emergency_mode(self) -> bool:
@@ -224,7 +515,7 @@ class ArduinoController:
         """
         success = self.send_command("E")
         if success:
-            print("→ Arduino: Emergency mode enabled (both lights flashing red)")
+            self._log.debug("→ Arduino: Emergency mode enabled (both lights flashing red)")
         return success
 
     def turn_off(self) -> bool:
@@ -236,7 +527,7 @@ class ArduinoController:
         """
         success = self.send_command("OFF")
         if success:
-            print("→ Arduino: All lights OFF")
+            self._log.debug("→ Arduino: All lights OFF")
         return success
 
     def run_test(self) -> bool:
@@ -249,7 +540,7 @@ class ArduinoController:
         """
         success = self.send_command("T")
         if success:
-            print("→ Arduino: Running test sequence")
+            self._log.debug("→ Arduino: Running test sequence")
         return success
 
     def get_status(self) -> bool:
@@ -259,26 +550,85 @@ class ArduinoController:
         Returns:
             True if command sent successfully
         """
-        return self.send_command("STATUS")
+        if not self._ready:
+            return False
+
+        # Drop stale output (e.g. AUTO mode messages) so the replies that
+        # follow belong to this request
+        try:
+            self.serial.reset_input_buffer()
+        except Exception as e:
+            print(f"Error clearing Arduino input: {e}")
+        self._rx_buf.clear()
+
+        return self.send_command("STATUS") and self.flush()
 
     def read_response(self) -> Optional[str]:
         """
-        Read response from Arduino.
+        Read one response line from Arduino without blocking.
+        Bytes are read as they arrive and buffered until a full line is available.
 
         Returns:
-            Response string or None if no data available
+            Response string or None if no complete line available
         """
-        if not self.connected or self.serial is None:
+        if not self._ready:
             return None
 
         try:
-            if self.serial.in_waiting > 0:
-                response = self.serial.readline().decode().strip()
-                return response
+            # Only take what has already arrived, so this never blocks
+            waiting = self.serial.in_waiting
+            if waiting:
+                self._rx_buf += self.serial.read(waiting)
         except Exception as e:
             print(f"Error reading from Arduino: {e}")
 
-        return None
+        newline = self._rx_buf.find(b"\n")
+        if newline < 0:
+            return None
+
+        line = bytes(self._rx_buf[:newline])
+        del self._rx_buf[:newline + 1]
+        return line.decode("ascii", "replace").strip()
+
+    def read_line(self, timeout: float) -> Optional[str]:
+        """
+        Read one response line from Arduino, waiting for it to arrive.
+        Returns as soon as a full line is available instead of polling.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Response string or None if no complete line arrived in time
+        """
+        line = self.read_response()
+        if line is not None or not self._ready:
+            return line
+
+        try:
+            # Other reads only take bytes already waiting, so the port timeout
+            # only matters here; it is changed only when it differs
+            timeout = max(0.0, timeout)
+            if self.serial.timeout != timeout:
+                self.serial.timeout = timeout
+            self._rx_buf += self.serial.read_until(b"\n")
+        except Exception as e:
+            print(f"Error reading from Arduino: {e}")
+
+        return self.read_response()
+
+    def read_responses(self) -> List[str]:
+        """
+        Read all complete lines received from Arduino so far.
+
+        Returns:
+            List of response strings (empty if no data available)
+        """
+        responses = []
+        while (response := self.read_response()) is not None:
+            if response:
+                responses.append(response)
+        return responses
 
     def reset(self) -> bool:
         """
@@ -287,28 +637,147 @@ class ArduinoController:
         Returns:
             True if reset successful
         """
-        return self.set_red_1() and self.set_red_2()
+        success = self.send_commands(("R1", "R2"))
+        if success:
+            self._log.debug("→ Arduino: Both lights set to RED")
+        return success
 
     def disconnect(self):
         """Disconnect from Arduino."""
         if self.serial and self.connected:
             try:
                 # Set both lights to red before disconnecting
-                self.set_red_1()
-                self.set_red_2()
+                self.reset()
+                self.flush()
                 time.sleep(0.5)
+                self._stop_tx_thread()
                 self.serial.close()
                 print("✓ Disconnected from Arduino")
             except Exception as e:
                 print(f"Error disconnecting: {e}")
 
+        self._stop_tx_thread()
         self.connected = False
+        self._ready = False
+        self._fd = None
         self.serial = None
 
     def is_connected(self) -> bool:
         """Check if Arduino is connected."""
-        return self.connected and self.serial is not None and self.serial.is_open
+        return self._ready
+
+    def check_connection(self) -> bool:
+        """
+        Re-check that the serial port is still open and update the cached state.
+        Cheap enough to call periodically, but not meant for every command.
+
+        Returns:
+            True if Arduino is connected
+        """
+        self._ready = self.connected and self.serial is not None and self.serial.is_open
+        return self._ready
 
     def __del__(self):
         """Cleanup on object destruction."""
+        if sys.is_finalizing():
+            # Daemon threads no longer run at interpreter shutdown, so the
+            # transmit thread can't be waited for; set the lights red directly
+            if self.serial is not None and self.connected:
+                try:
+                    self.serial.write(self._encoded["R1"] + self._encoded["R2"])
+                    self.serial.flush()
+                    self.serial.close()
+                except Exception:
+                    pass
+            return
+
         self.disconnect()
+
+
+def _tx_loop(controller_ref, tx_queue, port, fd, abort):
+    """
+    Transmit thread: write queued commands to the serial port.
+    Everything that piled up since the last wakeup goes out in one write().
+    Writes are non-blocking; bytes the OS could not take yet are kept and
+    retried. A None item stops the thread once all data has been written.
+
+    Args:
+        controller_ref: weakref to the ArduinoController, marked not ready on errors
+        tx_queue: Queue of bytes to write (None to stop)
+        port: Open serial.Serial
+        fd: Raw file descriptor of the port for os.write(), or None
+        abort: Event set when unsent data must be dropped so the port can close
+    """
+    pending = b""
+    unfinished = 0  # queue items whose bytes are still pending
+    stopping = False
+    while True:
+        items = []
+        if not pending and not stopping:
+            items.append(tx_queue.get())
+        while True:
+            try:
+                items.append(tx_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        unfinished += len(items)
+        if None in items:
+            stopping = True
+        pending += b"".join(item for item in items if item is not None)
+
+        if abort.is_set():
+            # The port is about to be closed; the fd must not be written again
+            pending = b""
+            stopping = True
+
+        if pending:
+            try:
+                if fd is not None:
+                    written = os.write(fd, pending)
+                else:
+                    written = port.write(pending)
+                    if written is None:
+                        written = len(pending)
+            except (serial.SerialTimeoutException, BlockingIOError):
+                # OS transmit buffer is full, try again shortly
+                written = 0
+            except Exception as e:
+                print(f"Error sending command: {e}")
+                controller = controller_ref()
+                if controller is not None:
+                    controller._ready = False
+                del controller
+                written = len(pending)
+            pending = pending[written:]
+
+        if pending:
+            # Give the OS time to drain its transmit buffer
+            time.sleep(0.001)
+            continue
+
+        for _ in range(unfinished):
+            tx_queue.task_done()
+        unfinished = 0
+
+        if stopping:
+            return
+
+
+def _make_setter(name: str, idx: int, color: str):
+    """Build a set_<color>_<n> method that forwards to ArduinoController.set_light()."""
+    def setter(self) -> bool:
+        return self.set_light(idx, color, announce=True)
+
+    setter.__name__ = name
+    setter.__qualname__ = f"ArduinoController.{name}"
+    setter.__doc__ = f"Set traffic light {idx} to {COLOR_NAMES[color]}."
+    return setter
+
+
+# Per-light convenience setters: set_red_1(), set_yellow_1(), ... set_green_2().
+# They share one code object instead of six near-identical method bodies.
+for _name, _idx, _color in (("set_red_1", 1, 'R'), ("set_yellow_1", 1, 'Y'), ("set_green_1", 1, 'G'),
+                            ("set_red_2", 2, 'R'), ("set_yellow_2", 2, 'Y'), ("set_green_2", 2, 'G')):
+    setattr(ArduinoController, _name, _make_setter(_name, _idx, _color))
+del _name, _idx, _color
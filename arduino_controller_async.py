@@ -0,0 +1,200 @@
+"""
+Asyncio Arduino controller module for managing dual traffic lights.
+Speaks the same serial protocol as ArduinoController, but serial I/O runs
+on the event loop so it can overlap with other work.
+"""
+import asyncio
+import serial.tools.list_ports
+from typing import Iterable, Optional
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+from arduino_controller import ArduinoController
+
+
+class AsyncArduinoController:
+    """Asyncio version of ArduinoController built on pyserial-asyncio."""
+
+    def __init__(self, port: Optional[str] = None, baudrate: int = 115200, timeout: float = 2):
+        """
+        Initialize async Arduino controller. Call connect() before use.
+
+        Args:
+            port: Serial port (e.g., 'COM3' on Windows, '/dev/ttyUSB0' on Linux)
+                  If None, will auto-detect Arduino
+            baudrate: Communication speed (default: 115200, must match traffic_lights.ino)
+            timeout: Maximum seconds to wait for the Arduino to boot
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = False
+
+    async def connect(self) -> bool:
+        """
+        Connect to Arduino board.
+
+        Returns:
+            True if connected successfully, False otherwise
+        """
+        if serial_asyncio is None:
+            print("pyserial-asyncio is not installed: pip install pyserial-asyncio")
+            return False
+
+        try:
+            # Auto-detect if port not specified
+            if self.port is None:
+                ports = list(serial.tools.list_ports.comports())
+                self.port = ArduinoController.auto_detect_arduino(ports)
+                if self.port is None:
+                    print("Arduino not found. Available ports:")
+                    for port in ArduinoController.list_ports(ports):
+                        print(f"  - {port}")
+                    return False
+
+            # Open serial connection
+            self.reader, self.writer = await serial_asyncio.open_serial_connection(
+                url=self.port,
+                baudrate=self.baudrate
+            )
+
+            # Wait for Arduino to reset
+            await self._wait_for_boot()
+
+            self.connected = True
+            print(f"✓ Connected to Arduino on {self.port}")
+            return True
+
+        except Exception as e:
+            print(f"Error connecting to Arduino: {e}")
+            self.connected = False
+            return False
+
+    async def _wait_for_boot(self, quiet_time: float = 0.1):
+        """
+        Wait until the Arduino boot banner has arrived and discard it.
+
+        Args:
+            quiet_time: Seconds without new bytes after which the banner is done
+        """
+        wait = self.timeout
+        while True:
+            try:
+                data = await asyncio.wait_for(self.reader.read(1024), wait)
+            except asyncio.TimeoutError:
+                return
+            if not data:
+                return
+            wait = quiet_time
+
+    async def send_command(self, command: str) -> bool:
+        """
+        Send command to Arduino.
+
+        Args:
+            command: Command string to send
+
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        return await self.send_commands((command,))
+
+    async def send_commands(self, commands: Iterable[str]) -> bool:
+        """
+        Send several commands to Arduino in one write.
+
+        Args:
+            commands: Command strings to send, in order
+
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        return await self.write_batch("".join(f"{command}\n" for command in commands).encode("ascii"))
+
+    async def write_batch(self, payload: bytes) -> bool:
+        """
+        Send pre-encoded commands to Arduino in one write.
+
+        Args:
+            payload: Newline-terminated command bytes, e.g. b"R1\nG2\n"
+
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        if not self.connected or self.writer is None:
+            return False
+
+        try:
+            self.writer.write(payload)
+            await self.writer.drain()
+            return True
+        except Exception as e:
+            print(f"Error sending command: {e}")
+            return False
+
+    async def get_status(self) -> bool:
+        """
+        Request current status from Arduino.
+
+        Returns:
+            True if command sent successfully
+        """
+        return await self.send_command("STATUS")
+
+    async def read_response(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Read one line from Arduino.
+
+        Args:
+            timeout: Seconds to wait for a line (None waits indefinitely)
+
+        Returns:
+            Response string or None if nothing arrived in time
+        """
+        if not self.connected or self.reader is None:
+            return None
+
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            print(f"Error reading from Arduino: {e}")
+            return None
+
+        return line.decode(errors="replace").strip() if line else None
+
+    async def reset(self) -> bool:
+        """
+        Reset Arduino (set both lights to red).
+
+        Returns:
+            True if reset successful
+        """
+        return await self.send_commands(("R1", "R2"))
+
+    async def disconnect(self):
+        """Disconnect from Arduino."""
+        if self.writer is not None and self.connected:
+            try:
+                # Set both lights to red before disconnecting
+                await self.reset()
+                await asyncio.sleep(0.5)
+                self.writer.close()
+                await self.writer.wait_closed()
+                print("✓ Disconnected from Arduino")
+            except Exception as e:
+                print(f"Error disconnecting: {e}")
+
+        self.connected = False
+        self.reader = None
+        self.writer = None
+
+    def is_connected(self) -> bool:
+        """Check if Arduino is connected."""
+        return self.connected and self.writer is not None and not self.writer.is_closing()
@@ -3,100 +3,195 @@ Download and compare YOLO models for traffic control system.
 This script helps you download different YOLO models and shows their specs.
 """
 
-from ultralytics import YOLO
+from concurrent.futures import ThreadPoolExecutor
 import os
+import queue
+import urllib.request
 
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
 
-def download_model(model_name):
+
+# Ultralytics release assets hosting the pretrained weights
+MODEL_URL = "https://github.com/ultralytics/assets/releases/download/v8.3.0/{name}"
+CHUNK_SIZE = 1 << 20  # 1 MiB
+TIMEOUT = 30  # Seconds without data before a download is treated as failed
+
+
+def download_model(model_name, log=print, force=False, position=0):
     """
-    Download a YOLO model. Ultralytics will automatically download it
-    if it doesn't exist locally.
+    Download YOLO model weights straight from the Ultralytics release assets.
+    The file is streamed to disk, so torch is never imported or loaded.
 
     Args:
         model_name: Name of the model (e.g., 'yolov8s.pt')
+        log: Function used to report progress (default: print)
+        force: Download again even if the weights file already exists
+        position: Line of the progress bar when several downloads run at once
     """
-    print(f"\n{'='*60}")
-    print(f"Downloading/Loading: {model_name}")
-    print(f"{'='*60}")
+    log(f"\n{'='*60}")
+    log(f"Downloading: {model_name}")
+    log(f"{'='*60}")
+
+    # Skip the download when the weights are already on disk
+    if not force and os.path.exists(model_name):
+        size_mb = os.path.getsize(model_name) / (1024 * 1024)
+        log(f"✓ Already present: {model_name} ({size_mb:.1f} MB)")
+        return True
 
+    # Write to a temporary file so an interrupted download isn't mistaken
+    # for a complete one on the next run
+    part_path = model_name + ".part"
     try:
-        model = YOLO(model_name)
-
-        # Get file size if it exists
-        if os.path.exists(model_name):
-            size_mb = os.path.getsize(model_name) / (1024 * 1024)
-            print(f"✓ Model downloaded successfully!")
-            print(f"  File: {model_name}")
-            print(f"  Size: {size_mb:.1f} MB")
-            print(f"  Location: {os.path.abspath(model_name)}")
-        else:
-            print(f"✓ Model loaded from cache")
-
+        with urllib.request.urlopen(MODEL_URL.format(name=model_name), timeout=TIMEOUT) as response:
+            total = int(response.headers.get("Content-Length", 0)) or None
+            progress = None
+            if tqdm is not None:
+                progress = tqdm(total=total, unit="B", unit_scale=True, desc=model_name,
+                                position=position, leave=False)
+
+            with open(part_path, "wb") as f:
+                while chunk := response.read(CHUNK_SIZE):
+                    f.write(chunk)
+                    if progress is not None:
+                        progress.update(len(chunk))
+
+            if progress is not None:
+                progress.close()
+
+        os.replace(part_path, model_name)
+
+        size_mb = os.path.getsize(model_name) / (1024 * 1024)
+        log(f"✓ Model downloaded successfully!")
+        log(f"  File: {model_name}")
+        log(f"  Size: {size_mb:.1f} MB")
+        log(f"  Location: {os.path.abspath(model_name)}")
         return True
 
     except Exception as e:
-        print(f"✗ Failed to download {model_name}")
-        print(f"  Error: {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        log(f"✗ Failed to download {model_name}")
+        log(f"  Error: {e}")
         return False
 
 
-def show_model_comparison():
-    """Display comparison of different YOLO models."""
+def download_models(model_names, force=False):
+    """
+    Download several YOLO models concurrently.
+    Each model's output is collected and printed once all downloads finish,
+    so messages from different models don't interleave.
+
+    Args:
+        model_names: List of model names to download
+        force: Download each model even if its weights file already exists
+
+    Returns:
+        Number of models downloaded successfully
+    """
+    messages = queue.Queue()
+
+    def download(model_name, position):
+        lines = []
+        success = download_model(model_name, log=lines.append, force=force, position=position)
+        messages.put("\n".join(lines))
+        return success
+
+    with ThreadPoolExecutor(max_workers=min(5, len(model_names))) as executor:
+        results = list(executor.map(download, model_names, range(len(model_names))))
+
+    while not messages.empty():
+        print(messages.get())
+
+    return sum(results)
+
+
+# Model family shown by the downloader. Supporting another YOLO family only
+# needs another config like this one; the menu and table are built from it.
+YOLO11_CFG = {
+    "title": "YOLO11 (LATEST)",
+    # (file, size, speed, accuracy, recommended for)
+    "models": [
+        ("yolo11n.pt", "5.5 MB", "Fastest", "Good", "Fast detection, low-end hardware"),
+        ("yolo11s.pt", "19 MB", "Fast", "Better", "RECOMMENDED - Best balance"),
+        ("yolo11m.pt", "40 MB", "Medium", "Great", "Higher accuracy, slower"),
+        ("yolo11l.pt", "52 MB", "Slow", "Excellent", "Maximum accuracy"),
+        ("yolo11x.pt", "109 MB", "Slowest", "Best", "Professional use"),
+    ],
+    # (menu label, models to download)
+    "menu": [
+        ("yolo11s.pt (Small - RECOMMENDED)", ["yolo11s.pt"]),
+        ("yolo11m.pt (Medium - More accurate)", ["yolo11m.pt"]),
+        ("Both", ["yolo11s.pt", "yolo11m.pt"]),
+        ("All YOLO11 models (n, s, m, l, x)",
+         ["yolo11n.pt", "yolo11s.pt", "yolo11m.pt", "yolo11l.pt", "yolo11x.pt"]),
+    ],
+    "recommend": "yolo11s.pt",
+    "alternative": "yolo11m.pt",
+    "notes": [
+        "YOLO11 is the latest version with improved accuracy and speed!",
+        "For toy car detection, we recommend: yolo11s.pt or yolo11m.pt",
+        "These provide excellent accuracy without being too slow.",
+    ],
+}
+
+
+def show_model_comparison(cfg=YOLO11_CFG):
+    """
+    Display comparison of different YOLO models.
+
+    Args:
+        cfg: Model family config (see YOLO11_CFG)
+    """
     print("\n" + "="*80)
-    print("YOLO MODEL COMPARISON - YOLO11 (LATEST)")
+    print(f"YOLO MODEL COMPARISON - {cfg['title']}")
     print("="*80)
     print()
-    print("Model       | Size    | Speed    | Accuracy | Recommended For")
-    print("------------+---------+----------+----------+--------------------------------")
-    print("yolo11n.pt  | 5.5 MB  | Fastest  | Good     | Fast detection, low-end hardware")
-    print("yolo11s.pt  | 19 MB   | Fast     | Better   | RECOMMENDED - Best balance")
-    print("yolo11m.pt  | 40 MB   | Medium   | Great    | Higher accuracy, slower")
-    print("yolo11l.pt  | 52 MB   | Slow     | Excellent| Maximum accuracy")
-    print("yolo11x.pt  | 109 MB  | Slowest  | Best     | Professional use")
+    print("Model       | Size    | Speed    | Accuracy  | Recommended For")
+    print("------------+---------+----------+-----------+-------------------------------")
+    for name, size, speed, accuracy, use in cfg["models"]:
+        print(f"{name:<11} | {size:<7} | {speed:<8} | {accuracy:<9} | {use}")
     print("="*80)
     print()
-    print("YOLO11 is the latest version with improved accuracy and speed!")
-    print("For toy car detection, we recommend: yolo11s.pt or yolo11m.pt")
-    print("These provide excellent accuracy without being too slow.")
+    for note in cfg["notes"]:
+        print(note)
     print()
 
 
-def main():
-    """Main function to download models."""
-    show_model_comparison()
+def run_downloader(cfg=YOLO11_CFG, force=False):
+    """
+    Show the model menu for a model family and download the chosen models.
+
+    Args:
+        cfg: Model family config (see YOLO11_CFG)
+        force: Download models even if the weights file already exists
+    """
+    show_model_comparison(cfg)
+
+    menu = cfg["menu"]
+    exit_choice = len(menu) + 1
 
     print("\nWhich models would you like to download?")
-    print("1. yolo11s.pt (Small - RECOMMENDED)")
-    print("2. yolo11m.pt (Medium - More accurate)")
-    print("3. Both")
-    print("4. All YOLO11 models (n, s, m, l, x)")
-    print("5. Exit")
-
-    choice = input("\nEnter your choice (1-5): ").strip()
-
-    models_to_download = []
-
-    if choice == '1':
-        models_to_download = ['yolo11s.pt']
-    elif choice == '2':
-        models_to_download = ['yolo11m.pt']
-    elif choice == '3':
-        models_to_download = ['yolo11s.pt', 'yolo11m.pt']
-    elif choice == '4':
-        models_to_download = ['yolo11n.pt', 'yolo11s.pt', 'yolo11m.pt', 'yolo11l.pt', 'yolo11x.pt']
-    elif choice == '5':
+    for number, (label, _) in enumerate(menu, start=1):
+        print(f"{number}. {label}")
+    print(f"{exit_choice}. Exit")
+
+    choice = input(f"\nEnter your choice (1-{exit_choice}): ").strip()
+
+    if choice == str(exit_choice):
         print("Exiting...")
         return
+    elif choice.isdigit() and 1 <= int(choice) <= len(menu):
+        models_to_download = menu[int(choice) - 1][1]
     else:
-        print("Invalid choice. Downloading yolo11s.pt by default...")
-        models_to_download = ['yolo11s.pt']
+        print(f"Invalid choice. Downloading {cfg['recommend']} by default...")
+        models_to_download = [cfg["recommend"]]
 
     print(f"\nDownloading {len(models_to_download)} model(s)...")
 
-    success_count = 0
-    for model_name in models_to_download:
-        if download_model(model_name):
-            success_count += 1
+    success_count = download_models(models_to_download, force=force)
 
     print("\n" + "="*60)
     print(f"DOWNLOAD COMPLETE: {success_count}/{len(models_to_download)} successful")
@@ -106,10 +201,22 @@ def main():
         print("\nTo use a model, run:")
         print(f"  python smart_traffic_control.py --model {models_to_download[0]}")
         print("\nOr for a different model:")
-        print("  python smart_traffic_control.py --model yolo11s.pt")
-        print("  python smart_traffic_control.py --model yolo11m.pt")
+        print(f"  python smart_traffic_control.py --model {cfg['recommend']}")
+        print(f"  python smart_traffic_control.py --model {cfg['alternative']}")
         print("\nFor real car detection:")
-        print("  python smart_traffic_control.py --model yolo11s.pt --real-cars")
+        print(f"  python smart_traffic_control.py --model {cfg['recommend']} --real-cars")
+
+
+def main():
+    """Main function to download models."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Download YOLO models for the traffic control system')
+    parser.add_argument('--force', action='store_true',
+                       help='Download models even if the weights file already exists')
+    args = parser.parse_args()
+
+    run_downloader(YOLO11_CFG, force=args.force)
 
 
 if __name__ == "__main__":
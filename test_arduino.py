@@ -2,9 +2,41 @@
 Arduino connection test script.
 Tests serial communication and dual traffic light control.
 """
+import asyncio
+import threading
 import time
 import sys
-from arduino_controller import ArduinoController
+import traceback
+from arduino_controller import ArduinoController, COMMANDS
+from arduino_controller_async import AsyncArduinoController
+
+
+# What each interactive command prints ('q', 'status' and 'off' are handled
+# separately); payloads come from the controller's COMMANDS table so the
+# protocol is defined in one place, and a dict lookup replaces an if/elif chain
+_MESSAGES = {
+    "R1": "Light 1: RED",
+    "Y1": "Light 1: YELLOW",
+    "G1": "Light 1: GREEN",
+    "R2": "Light 2: RED",
+    "Y2": "Light 2: YELLOW",
+    "G2": "Light 2: GREEN",
+    "A": "Mode: AUTOMATIC (dual lights, opposite phases)",
+    "M": "Mode: MANUAL",
+    "E": "Mode: EMERGENCY (both lights flashing)",
+    "T": "Running test sequence...",
+}
+_HANDLERS = {c.lower(): (f"{c}\n".encode("ascii"), _MESSAGES[c])
+             for c in COMMANDS if c in _MESSAGES}
+
+# Coordinated phases for test_light_sequence as set_state() arguments:
+# both lights selected, light 1 color in the low nibble, light 2 in the high
+_PHASES = (
+    ("Light 1: RED, Light 2: GREEN", 0b11, 0x31),
+    ("Light 1: GREEN, Light 2: RED", 0b11, 0x13),
+    ("Light 1: YELLOW, Light 2: RED", 0b11, 0x12),
+    ("Light 1: RED, Light 2: GREEN", 0b11, 0x31),
+)
 
 
 def print_header(text):
@@ -14,6 +46,26 @@ def print_header(text):
     print("=" * 60)
 
 
+def print_responses(arduino, prefix="", timeout=0.5):
+    """Print Arduino response lines until none arrives within timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        response = arduino.read_line(remaining)
+        if response is None:
+            break
+        if response:
+            print(f"{prefix}{response}")
+            deadline = time.monotonic() + timeout
+
+
+def _drain_until(arduino, stop, timeout=0.2):
+    """Print Arduino response lines as they arrive until stop is set."""
+    while not stop.is_set() and arduino.is_connected():
+        response = arduino.read_line(timeout)
+        if response:
+            print(f"  {response}")
+
+
 def test_connection(arduino):
     """Test Arduino connection."""
     print_header("TEST 1: Connection Check")
@@ -35,32 +87,19 @@ def test_light_1(arduino):
     """Test traffic light 1."""
     print_header("TEST 2: Traffic Light 1")
 
-    print("Testing Light 1 - RED...")
-    success_r = arduino.set_red_1()
-    if success_r:
-        print("✓ Light 1 RED activated")
-        time.sleep(1.5)
-    else:
-        print("✗ Light 1 RED failed")
-        return False
-
-    print("\nTesting Light 1 - YELLOW...")
-    success_y = arduino.set_yellow_1()
-    if success_y:
-        print("✓ Light 1 YELLOW activated")
-        time.sleep(1.5)
-    else:
-        print("✗ Light 1 YELLOW failed")
-        return False
+    # Red, yellow and green are queued up front and switched by the
+    # controller every 1.5 s; the test waits once for the whole sequence
+    print("Testing Light 1 - RED -> YELLOW -> GREEN (1.5 s each)...")
+    deadline = time.monotonic() + 4.5
+    steps = arduino.schedule([("R1", 1.5), ("Y1", 1.5), ("G1", 1.5)])
 
-    print("\nTesting Light 1 - GREEN...")
-    success_g = arduino.set_green_1()
-    if success_g:
-        print("✓ Light 1 GREEN activated")
-        time.sleep(1.5)
+    # Resolves once GREEN has been sent (True) or as soon as a step fails
+    if steps.result(timeout=deadline - time.monotonic() + 1.0):
+        time.sleep(max(0.0, deadline - time.monotonic()))
+        print("✓ Light 1 RED, YELLOW and GREEN activated")
         return True
     else:
-        print("✗ Light 1 GREEN failed")
+        print("✗ Light 1 sequence failed")
         return False
 
 
@@ -68,32 +107,19 @@ def test_light_2(arduino):
     """Test traffic light 2."""
     print_header("TEST 3: Traffic Light 2")
 
-    print("Testing Light 2 - RED...")
-    success_r = arduino.set_red_2()
-    if success_r:
-        print("✓ Light 2 RED activated")
-        time.sleep(1.5)
-    else:
-        print("✗ Light 2 RED failed")
-        return False
+    # Red, yellow and green are queued up front and switched by the
+    # controller every 1.5 s; the test waits once for the whole sequence
+    print("Testing Light 2 - RED -> YELLOW -> GREEN (1.5 s each)...")
+    deadline = time.monotonic() + 4.5
+    steps = arduino.schedule([("R2", 1.5), ("Y2", 1.5), ("G2", 1.5)])
 
-    print("\nTesting Light 2 - YELLOW...")
-    success_y = arduino.set_yellow_2()
-    if success_y:
-        print("✓ Light 2 YELLOW activated")
-        time.sleep(1.5)
-    else:
-        print("✗ Light 2 YELLOW failed")
-        return False
-
-    print("\nTesting Light 2 - GREEN...")
-    success_g = arduino.set_green_2()
-    if success_g:
-        print("✓ Light 2 GREEN activated")
-        time.sleep(1.5)
+    # Resolves once GREEN has been sent (True) or as soon as a step fails
+    if steps.result(timeout=deadline - time.monotonic() + 1.0):
+        time.sleep(max(0.0, deadline - time.monotonic()))
+        print("✓ Light 2 RED, YELLOW and GREEN activated")
         return True
     else:
-        print("✗ Light 2 GREEN failed")
+        print("✗ Light 2 sequence failed")
         return False
 
 
@@ -103,19 +129,10 @@ def test_light_sequence(arduino):
 
     print("Testing coordinated sequence (opposite phases)...")
 
-    sequences = [
-        ("Light 1: RED, Light 2: GREEN", arduino.set_red_1, arduino.set_green_2),
-        ("Light 1: GREEN, Light 2: RED", arduino.set_green_1, arduino.set_red_2),
-        ("Light 1: YELLOW, Light 2: RED", arduino.set_yellow_1, arduino.set_red_2),
-        ("Light 1: RED, Light 2: GREEN", arduino.set_red_1, arduino.set_green_2)
-    ]
-
     all_success = True
-    for desc, func1, func2 in sequences:
+    for desc, mask, colors in _PHASES:
         print(f"\n{desc}...")
-        success1 = func1()
-        success2 = func2()
-        if success1 and success2:
+        if arduino.set_state(mask, colors):
             print(f"✓ Sequence activated")
             time.sleep(1.5)
         else:
@@ -135,8 +152,7 @@ def test_modes(arduino):
         time.sleep(1)
 
         print("\n2. Testing manual control of both lights...")
-        arduino.set_green_1()
-        arduino.set_red_2()
+        arduino.set_state(0b11, 0x13)
         print("  Light 1: GREEN, Light 2: RED")
         time.sleep(2)
     else:
@@ -155,7 +171,14 @@ def test_modes(arduino):
     if arduino.set_auto_mode():
         print("✓ Auto mode activated (dual lights, opposite phases)")
         print("  Watching automatic cycling for 10 seconds...")
+
+        # Print the Arduino's AUTO messages while waiting
+        stop = threading.Event()
+        drain = threading.Thread(target=_drain_until, args=(arduino, stop), daemon=True)
+        drain.start()
         time.sleep(10)
+        stop.set()
+        drain.join(0.5)
     else:
         print("✗ Auto mode failed")
         return False
@@ -187,15 +210,10 @@ def test_special_functions(arduino):
     print("\n3. Testing STATUS command...")
     if arduino.get_status():
         print("✓ Status command sent")
-        time.sleep(1)
 
-        # Try to read status response
+        # Print status lines as they arrive, until the Arduino goes quiet
         print("\nReading Arduino response...")
-        for _ in range(5):
-            response = arduino.read_response()
-            if response:
-                print(f"  {response}")
-            time.sleep(0.1)
+        print_responses(arduino, "  ")
     else:
         print("✗ Status command failed")
         return False
@@ -203,10 +221,59 @@ def test_special_functions(arduino):
     return True
 
 
-def interactive_test(arduino):
-    """Interactive test mode."""
+async def ainput(prompt=""):
+    """
+    Read a line from the keyboard without blocking the event loop.
+    input() runs on a daemon thread, so a pending prompt never keeps the
+    script alive after Ctrl+C.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result, error):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def read():
+        try:
+            result, error = input(prompt), None
+        except BaseException as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def print_arduino_output(arduino):
+    """Print every line the Arduino sends, as it arrives."""
+    while arduino.is_connected():
+        response = await arduino.read_response()
+        if response is None:
+            break
+        if response:
+            print(f"  {response}")
+
+
+async def interactive_test(port):
+    """
+    Interactive test mode.
+    Runs on asyncio, so Arduino output (command replies, AUTO mode changes,
+    status) is printed while waiting for keyboard input.
+    """
     print_header("INTERACTIVE TEST MODE")
 
+    arduino = AsyncArduinoController(port=port)
+    if not await arduino.connect():
+        print("✗ Could not open the Arduino for interactive mode")
+        return
+
     print("\nCommands:")
     print("  r1/y1/g1 - Light 1 Red/Yellow/Green")
     print("  r2/y2/g2 - Light 2 Red/Yellow/Green")
@@ -219,61 +286,35 @@ def interactive_test(arduino):
     print("  q        - Quit")
     print("\nEnter commands:")
 
-    while True:
-        try:
-            cmd = input("\n> ").strip().lower()
-
-            if cmd == 'q':
+    reader = asyncio.create_task(print_arduino_output(arduino))
+    try:
+        while True:
+            try:
+                cmd = (await ainput("\n> ")).strip().lower()
+
+                if cmd == 'q':
+                    break
+                elif cmd == 'off':
+                    await arduino.send_command("OFF")
+                    print("All lights: OFF")
+                elif cmd == 'status':
+                    # The reply is printed by the reader task
+                    await arduino.get_status()
+                elif (handler := _HANDLERS.get(cmd)) is not None:
+                    payload, message = handler
+                    await arduino.write_batch(payload)
+                    print(message)
+                else:
+                    print("Unknown command")
+
+            except (KeyboardInterrupt, EOFError):
                 break
-            elif cmd == 'r1':
-                arduino.set_red_1()
-                print("Light 1: RED")
-            elif cmd == 'y1':
-                arduino.set_yellow_1()
-                print("Light 1: YELLOW")
-            elif cmd == 'g1':
-                arduino.set_green_1()
-                print("Light 1: GREEN")
-            elif cmd == 'r2':
-                arduino.set_red_2()
-                print("Light 2: RED")
-            elif cmd == 'y2':
-                arduino.set_yellow_2()
-                print("Light 2: YELLOW")
-            elif cmd == 'g2':
-                arduino.set_green_2()
-                print("Light 2: GREEN")
-            elif cmd == 'a':
-                arduino.set_auto_mode()
-                print("Mode: AUTOMATIC (dual lights, opposite phases)")
-            elif cmd == 'm':
-                arduino.set_manual_mode()
-                print("Mode: MANUAL")
-            elif cmd == 'e':
-                arduino.set_emergency_mode()
-                print("Mode: EMERGENCY (both lights flashing)")
-            elif cmd == 't':
-                arduino.run_test()
-                print("Running test sequence...")
-            elif cmd == 'off':
-                arduino.turn_off()
-                print("All lights: OFF")
-            elif cmd == 'status':
-                arduino.get_status()
-                time.sleep(0.2)
-                # Read responses
-                for _ in range(10):
-                    response = arduino.read_response()
-                    if response:
-                        print(response)
-                    time.sleep(0.05)
-            else:
-                print("Unknown command")
-
-        except KeyboardInterrupt:
-            break
-        except Exception as e:
-            print(f"Error: {e}")
+            except Exception as e:
+                print(f"Error: {e}")
+                traceback.print_exc()
+    finally:
+        reader.cancel()
+        await arduino.disconnect()
 
     print("\nExiting interactive mode...")
 
@@ -350,7 +391,12 @@ def main():
         response = input("\nRun interactive test? (y/n): ").strip().lower()
 
         if response == 'y':
-            interactive_test(arduino)
+            # The async controller opens the port itself, so release it first
+            arduino.disconnect()
+            try:
+                asyncio.run(interactive_test(arduino.port))
+            except KeyboardInterrupt:
+                print("\nExiting interactive mode...")
 
         # Cleanup
         print("\nCleaning up...")
@@ -364,7 +410,6 @@ def main():
         return 1
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        import traceback
         traceback.print_exc()
         return 1
 
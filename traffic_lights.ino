@@ -24,6 +24,12 @@
  * - T: Run test sequence
  * - OFF: Turn all lights off
  * - STATUS: Display current mode and state
+ *
+ * Binary Command (4 bytes, sets both lights in one packet):
+ * - 0x02, mask, colors, '\n'
+ *   mask: bit 0 = Light 1, bit 1 = Light 2
+ *   colors: Light 1 in the low nibble, Light 2 in the high nibble
+ *           (0=Off, 1=Red, 2=Yellow, 3=Green)
  */
 
 // Pin definitions for Traffic Light 1
@@ -36,6 +42,9 @@ const int RED_PIN_2 = 10;
 const int YELLOW_PIN_2 = 9;
 const int GREEN_PIN_2 = 8;
 
+// First byte of a binary set-state packet
+const byte STATE_OPCODE = 0x02;
+
 // Timing configurations (in milliseconds)
 const unsigned long GREEN_DURATION = 5000;   // 5 seconds green
 const unsigned long YELLOW_DURATION = 2000;  // 2 seconds yellow
@@ -70,7 +79,7 @@ bool emergencyBlinkState = false;
 
 void setup() {
   // Initialize serial communication
-  Serial.begin(9600);
+  Serial.begin(115200);
 
   // Set all pins as OUTPUT for both traffic lights
   pinMode(RED_PIN_1, OUTPUT);
@@ -114,9 +123,17 @@ void setup() {
 void loop() {
   // Check for incoming serial commands
   if (Serial.available() > 0) {
-    String command = Serial.readStringUntil('\n');
-    command.trim(); // Remove whitespace
-    processCommand(command);
+    if (Serial.peek() == STATE_OPCODE) {
+      // Binary set-state packet: opcode, mask, colors, newline
+      byte packet[4];
+      if (Serial.readBytes(packet, 4) == 4 && packet[3] == '\n') {
+        processStateCommand(packet[1], packet[2]);
+      }
+    } else {
+      String command = Serial.readStringUntil('\n');
+      command.trim(); // Remove whitespace
+      processCommand(command);
+    }
   }
 
   // Handle automatic mode cycling
@@ -262,6 +279,42 @@ void processCommand(String command) {
   }
 }
 
+// Set one or both lights from a binary set-state packet
+void processStateCommand(byte mask, byte colors) {
+  if (currentMode != MANUAL) {
+    currentMode = MANUAL;
+    Serial.println("Switched to MANUAL mode");
+  }
+
+  if (mask & 0x01) {
+    currentState1 = stateFromCode(colors & 0x0F);
+    setLightState(1, currentState1);
+    Serial.print("Light 1: ");
+    printState(currentState1);
+  }
+
+  if (mask & 0x02) {
+    currentState2 = stateFromCode(colors >> 4);
+    setLightState(2, currentState2);
+    Serial.print("Light 2: ");
+    printState(currentState2);
+  }
+}
+
+// Convert a set-state color code to a light state
+State stateFromCode(byte code) {
+  switch (code) {
+    case 1:
+      return RED;
+    case 2:
+      return YELLOW;
+    case 3:
+      return GREEN;
+    default:
+      return OFF;
+  }
+}
+
 // Set the physical light state for a specific traffic light
 void setLightState(int lightNumber, State state) {
   int redPin, yellowPin, greenPin;